@@ -0,0 +1,51 @@
+# cython: language_level=3
+"""
+Compiled scalar decoding for bbg. Mirrors the pure Python _FIELD_DISPATCH table in bbg.py, which is used
+whenever this extension has not been built. Build in place with: cythonize -i _bbg_fast.pyx
+"""
+from datetime import datetime
+
+from blpapi import DataType
+
+
+cdef int BOOL = DataType.BOOL
+cdef int BYTE = DataType.BYTE
+cdef int BYTEARRAY = DataType.BYTEARRAY
+cdef int CHAR = DataType.CHAR
+cdef int CORRELATION_ID = DataType.CORRELATION_ID
+cdef int DATE = DataType.DATE
+cdef int DATETIME = DataType.DATETIME
+cdef int DECIMAL = DataType.DECIMAL
+cdef int ENUMERATION = DataType.ENUMERATION
+cdef int FLOAT32 = DataType.FLOAT32
+cdef int FLOAT64 = DataType.FLOAT64
+cdef int INT32 = DataType.INT32
+cdef int INT64 = DataType.INT64
+cdef int STRING = DataType.STRING
+cdef int TIME = DataType.TIME
+
+
+cpdef tuple decode_scalar(object name, object element):
+    cdef int data_type = element.datatype()
+
+    if data_type == FLOAT64 or data_type == INT32 or data_type == INT64 or data_type == FLOAT32 \
+            or data_type == DECIMAL or data_type == STRING or data_type == BOOL or data_type == CHAR \
+            or data_type == BYTE or data_type == BYTEARRAY or data_type == CORRELATION_ID:
+        return name, element.getValue()
+    elif data_type == ENUMERATION:
+        return name, element.getValueAsString()
+    elif data_type == DATE:
+        value = element.getValue()
+        return name, '%04d-%02d-%02d' % (value.year, value.month, value.day)
+    elif data_type == DATETIME:
+        value = element.getValue()
+        # blpapi hands back a plain date or time when only those parts are set
+        if not isinstance(value, datetime):
+            return name, value.strftime('%Y-%m-%d %H:%M:%S')
+        return name, '%04d-%02d-%02d %02d:%02d:%02d' % (value.year, value.month, value.day,
+                                                        value.hour, value.minute, value.second)
+    elif data_type == TIME:
+        value = element.getValue()
+        return name, '%02d:%02d:%02d' % (value.hour, value.minute, value.second)
+
+    raise KeyError(data_type)
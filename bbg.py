@@ -1,4 +1,4 @@
-from collections import OrderedDict
+from collections import defaultdict, deque, namedtuple
 from datetime import datetime
 
 import blpapi
@@ -17,8 +17,65 @@ RESPONSE_ERROR = blpapi.Name('responseError')
 FIELD_ID = blpapi.Name('fieldId')
 ERROR_INFO = blpapi.Name('errorInfo')
 CATEGORY = blpapi.Name('category')
+REASON = blpapi.Name('reason')
+DESCRIPTION = blpapi.Name('description')
+DATE = blpapi.Name('date')
+TIME = blpapi.Name('time')
+OPEN = blpapi.Name('open')
+HIGH = blpapi.Name('high')
+LOW = blpapi.Name('low')
+CLOSE = blpapi.Name('close')
+VOLUME = blpapi.Name('volume')
+NUM_EVENTS = blpapi.Name('numEvents')
+VALUE = blpapi.Name('value')
 
-BBG_SEQUENCES = [DataType.SEQUENCE, DataType.BYTEARRAY, DataType.CHOICE]
+ADMIN_EVENTS = frozenset((blpapi.Event.ADMIN, blpapi.Event.SESSION_STATUS))
+
+BBG_SEQUENCES = frozenset((DataType.SEQUENCE, DataType.BYTEARRAY, DataType.CHOICE))
+
+# blpapi.Name -> str, responses reuse a small set of names many times over
+_NAME_CACHE = {}
+
+
+def _nm(name, _cache=_NAME_CACHE):
+    value = _cache.get(name)
+    if value is None:
+        value = _cache[name] = str(name)
+    return value
+
+
+# Compiled historical row decoders, keyed by the tuple of requested fields
+_ROW_DECODERS = {}
+
+
+def _compile_row_decoder(fields):
+    """
+    Generate a historical row decoder with one straight-line lookup per requested field
+    :param fields: List of Bloomberg Field Names
+    :type fields: list
+    :return: Function taking a fieldData row and a dict to fill, returning the row's date
+    :rtype: function
+    """
+    key = tuple(fields)
+    decoder = _ROW_DECODERS.get(key)
+    if decoder is not None:
+        return decoder
+
+    namespace = {'DATE': DATE}
+    lines = ['def decode(row, dst):',
+             '    has_element = row.hasElement',
+             '    get_value = row.getElementValue']
+
+    for idx, field in enumerate(key):
+        namespace['_N{0}'.format(idx)] = blpapi.Name(field)
+        lines.append('    if has_element(_N{0}):'.format(idx))
+        lines.append('        dst[{0!r}] = get_value(_N{1})'.format(field, idx))
+
+    lines.append('    return get_value(DATE)')
+
+    exec(compile('\n'.join(lines), '<bbg row decoder>', 'exec'), namespace)
+    decoder = _ROW_DECODERS[key] = namespace['decode']
+    return decoder
 
 
 class RequestType(object):
@@ -62,28 +119,58 @@ class NonTradingDayFillMethod(object):
     NIL_VALUE = 'NIL_VALUE'
 
 
+class Bar(namedtuple('Bar', 'time open high low close volume numEvents value')):
+    """
+    A single intraday bar. Fields can be read as attributes, positionally or by name, e.g. bar.open or bar['open'].
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = _BAR_FIELD_INDEX[key]
+            except KeyError:
+                raise KeyError(key)
+        return tuple.__getitem__(self, key)
+
+
+_BAR_FIELD_INDEX = dict((field, idx) for idx, field in enumerate(Bar._fields))
+
+
 class ConnectionFailed(Exception):
     def __init__(self, message):
         super(ConnectionFailed, self).__init__(message)
 
 
+class RequestFailed(Exception):
+    def __init__(self, message):
+        super(RequestFailed, self).__init__(message)
+
+
 class Session(object):
 
     DEFAULT_HOST = 'localhost'
     DEFAULT_PORT = 8194
 
-    def __init__(self, host=None, port=None):
+    def __init__(self, host=None, port=None, options=None):
         """
         :param host: e.g. localhost
         :type host: str
         :param port: e.g. 8194
         :type port: int
+        :param options: Prepared session options to reuse, host and port are ignored when given
+        :type options: blpapi.SessionOptions
         """
-        self.host = self.DEFAULT_HOST or host
-        self.port = self.DEFAULT_PORT or port
-        self.session_options = blpapi.SessionOptions()
-        self.session_options.setServerHost(self.host)
-        self.session_options.setServerPort(self.port)
+        if options is None:
+            options = blpapi.SessionOptions()
+            options.setServerHost(host or self.DEFAULT_HOST)
+            options.setServerPort(port or self.DEFAULT_PORT)
+
+        # Report the endpoint the session actually connects to
+        self.host = options.serverHost()
+        self.port = options.serverPort()
+        self.session_options = options
         self.session = blpapi.Session(self.session_options)
         return
 
@@ -105,75 +192,130 @@ class Request(object):
     def create(self):
 
         try:
-            self.session.openService(self.service_name)
-            ref_data_service = self.session.getService(self.service_name)
-            self.request = ref_data_service.createRequest(self.request_type)
+            self.request = self.get_service().createRequest(self.request_type)
             return self.request
         except NotFoundException:
             raise
         except UnknownErrorException:
             raise
 
+    def get_service(self):
+
+        try:
+            self.session.openService(self.service_name)
+            return self.session.getService(self.service_name)
+        except NotFoundException:
+            raise
+        except UnknownErrorException:
+            raise
+
 
 class SessionFactory(object):
 
-    def __init__(self, session, cid, request_type):
+    def __init__(self, session, cid, request_type, columnar=False, fields=None):
+        """
+        :param session: Started Bloomberg session
+        :type session: blpapi.Session
+        :param cid: Correlation Id returned by session.sendRequest, or a list of them for several requests sent on the
+        same session
+        :type cid: blpapi.CorrelationId
+        """
         self.session = session
         self.cid = cid
+        self.cids = list(cid) if isinstance(cid, list) else [cid]
         self.request_type = request_type
+        self.columnar = columnar
+        self.fields = fields
+        self.row_decoder = None
+        if fields and request_type == RequestType.HISTORICAL_DATA:
+            self.row_decoder = _compile_row_decoder(fields)
         return
 
     def process_session(self):
+        return self.process_requests()[self.cid]
+
+    def process_requests(self):
+        """
+        Process the responses to every request this factory was given, all outstanding on the same session
+        :return: Dictionary of Correlation Ids & processed output
+        :rtype: dict
+        """
 
-        output = {}
-        security_responses = {}
+        cids = self.cids
+
+        outputs = dict((cid, {}) for cid in cids)
+        security_responses = dict((cid, defaultdict(lambda: defaultdict(int))) for cid in cids)
+        outstanding = set(cids)
 
         msg_processes = {RequestType.HISTORICAL_DATA: self._process_historical_data_msg,
                          RequestType.REFERENCE_DATA: self._process_ref_data_msg,
                          RequestType.INTRADAY_BAR_DATA: self._process_intraday_data_msg}
 
-        while True:
+        if self.columnar:
+            msg_processes[RequestType.INTRADAY_BAR_DATA] = self._process_intraday_data_msg_columnar
+            msg_processes[RequestType.REFERENCE_DATA] = self._process_ref_data_msg_columnar
+
+        process_msg = msg_processes[self.request_type]
+
+        while outstanding:
             ev = self.session.nextEvent(500)
+            event_type = ev.eventType()
 
-            for msg in ev:
+            # Admin and session status events never carry our requests, skip them without looking at their messages
+            if event_type in ADMIN_EVENTS:
+                continue
 
-                if self.cid in msg.correlationIds():
+            # A request status event for one of our requests means it failed and no response will follow
+            if event_type == blpapi.Event.REQUEST_STATUS:
+                for msg in ev:
+                    if any(cid in outputs for cid in msg.correlationIds()):
+                        raise RequestFailed(self._request_failure_description(msg))
+                continue
 
-                    security, sec_results = msg_processes[self.request_type](msg)
-                    response_type = str(msg.messageType())
+            for msg in ev:
 
-                    # For large requests (particularly intraday), the BBG message will be split into several responses.
-                    # Each response must be appended to the output.
-                    if security not in security_responses:
-                        security_responses[security] = []
-                        security_responses[security].append(response_type)
-                    else:
-                        security_responses[security].append(response_type)
+                for cid in msg.correlationIds():
+                    if cid not in outputs:
+                        continue
 
-                    msg_response_count = self._get_response_count(security, security_responses, response_type)
+                    security, sec_results = process_msg(msg)
+                    response_type = _nm(msg.messageType())
+                    output = outputs[cid]
+
+                    # For large requests (particularly intraday), the BBG message will be split into several
+                    # responses. Each response must be appended to the output.
+                    security_responses[cid][security][response_type] += 1
+                    msg_response_count = security_responses[cid][security][response_type]
 
                     if security:
                         if msg_response_count > 1:
-                            output[security] = self._merge_two_dicts(output[security], sec_results)
+                            output[security].update(sec_results)
                         else:
                             output[security] = sec_results
                     else:
-                        if msg_response_count > 1:
-                            output = self._merge_two_dicts(output, sec_results)
+                        if msg_response_count > 1 and self.columnar:
+                            self._extend_columns(output, sec_results)
+                        elif msg_response_count > 1:
+                            output.update(sec_results)
                         else:
-                            output = sec_results
+                            outputs[cid] = sec_results
 
-            if ev.eventType() == blpapi.Event.RESPONSE:
-                break
+                    # The final response for a request arrives as a RESPONSE rather than a PARTIAL_RESPONSE event
+                    if event_type == blpapi.Event.RESPONSE:
+                        outstanding.discard(cid)
 
-        return output
+        return outputs
 
-    def _get_response_count(self, security, security_responses, request_type):
-        return security_responses[security].count(request_type)
+    def _request_failure_description(self, msg):
+        if msg.hasElement(REASON) and msg.getElement(REASON).hasElement(DESCRIPTION):
+            return msg.getElement(REASON).getElementAsString(DESCRIPTION)
+        return 'Request Failed: {0}'.format(_nm(msg.messageType()))
 
     def _process_intraday_data_msg(self, msg):
 
-        results = OrderedDict()
+        # Plain dicts preserve insertion order, so bars stay in time order
+        results = {}
+        results_setitem = results.__setitem__
 
         # Check for response errors
         if msg.hasElement(RESPONSE_ERROR):
@@ -184,16 +326,57 @@ class SessionFactory(object):
             raise NotFoundException('No Bar Data in message.', 666)
         bar_data = msg.getElement(BAR_DATA)
 
-        for idx, bar_tick_data in enumerate(bar_data.getElement(BAR_TICK_DATA).values()):
+        for bar_tick_data in bar_data.getElement(BAR_TICK_DATA).values():
+            get_float = bar_tick_data.getElementAsFloat
+            get_integer = bar_tick_data.getElementAsInteger
+            bar_time = bar_tick_data.getElementAsDatetime(TIME)
 
-            data = {}
+            results_setitem(bar_time, Bar(bar_time, get_float(OPEN), get_float(HIGH), get_float(LOW), get_float(CLOSE),
+                                          get_integer(VOLUME), get_integer(NUM_EVENTS), get_float(VALUE)))
 
-            for element in bar_tick_data.elements():
-                data.setdefault(str(element.name()), element.getValue())
+        return None, results
 
-            results[data['time']] = data
+    def _process_intraday_data_msg_columnar(self, msg):
+        """
+        Processing for Intraday Bar calls, one list per bar field rather than a dict per bar
+        :param msg: Message from from Bloomberg Event
+        :type msg:
+        :return: None and a dictionary of bar field names to equal length lists
+        :rtype: tuple
+        """
 
-        return None, results
+        # Check for response errors
+        if msg.hasElement(RESPONSE_ERROR):
+            return None, self._response_error_factory(msg.getElement(RESPONSE_ERROR))
+
+        # Make sure there is bar data and get it
+        if not msg.hasElement(BAR_DATA):
+            raise NotFoundException('No Bar Data in message.', 666)
+        bar_tick_data = msg.getElement(BAR_DATA).getElement(BAR_TICK_DATA)
+
+        # The bar schema is fixed, so every column can be sized up front
+        bar_count = bar_tick_data.numValues()
+        times = [None] * bar_count
+        opens = [None] * bar_count
+        highs = [None] * bar_count
+        lows = [None] * bar_count
+        closes = [None] * bar_count
+        volumes = [None] * bar_count
+        num_events = [None] * bar_count
+        values = [None] * bar_count
+
+        for idx, bar in enumerate(bar_tick_data.values()):
+            times[idx] = bar.getElementAsDatetime(TIME)
+            opens[idx] = bar.getElementAsFloat(OPEN)
+            highs[idx] = bar.getElementAsFloat(HIGH)
+            lows[idx] = bar.getElementAsFloat(LOW)
+            closes[idx] = bar.getElementAsFloat(CLOSE)
+            volumes[idx] = bar.getElementAsInteger(VOLUME)
+            num_events[idx] = bar.getElementAsInteger(NUM_EVENTS)
+            values[idx] = bar.getElementAsFloat(VALUE)
+
+        return None, {'time': times, 'open': opens, 'high': highs, 'low': lows, 'close': closes,
+                      'volume': volumes, 'numEvents': num_events, 'value': values}
 
     def _process_ref_data_msg(self, msg):
         """
@@ -218,20 +401,17 @@ class SessionFactory(object):
         security_data = msg.getElement(SECURITY_DATA)
         security = None
 
-        # Get generic iterator for data and find its length
-        security_iterator = self._get_bbg_iterator(security_data)
-        security_iterator_len = self._get_iterator_len(security_data)
+        # Security data is always an array of securities
+        security_iterator_len = security_data.numValues()
 
-        for item in security_iterator:
+        for item in security_data.values():
 
             security = item.getElementAsString(SECURITY)
 
             # Check for field data
+            # Empty field data flattens to None
             field_data = item.getElement(FIELD_DATA)
-            if self._get_iterator_len(field_data) > 0:
-                security_data_results = self._flatten_dict(self._element_factory(field_data, []))
-            else:
-                security_data_results = {}
+            security_data_results = self._flatten_dict(self._element_factory(field_data)) or {}
 
             # Check for errors with the ticker
             security_errors = {}
@@ -239,9 +419,7 @@ class SessionFactory(object):
                 security_errors = self._security_error_factory(item.getElement(SECURITY_ERROR))
 
             # Check for errors with fields
-            field_exceptions = {}
-            if self._get_iterator_len(item.getElement(FIELD_EXCEPTIONS)) > 0:
-                field_exceptions = self._field_exception_factory(item.getElement(FIELD_EXCEPTIONS))
+            field_exceptions = self._field_exception_factory(item.getElement(FIELD_EXCEPTIONS))
 
             if security_iterator_len > 1:   # For nested results e.g. Yield Curve Objects
                 results[security] = {'security_data': security_data_results, 'field_exceptions': field_exceptions,
@@ -255,6 +433,63 @@ class SessionFactory(object):
         else:
             return security, results
 
+    def _process_ref_data_msg_columnar(self, msg):
+        """
+        Processing for Reference Data calls, one list per requested field rather than a dict per security
+        :param msg: Message from from Bloomberg Event
+        :type msg:
+        :return: None and a dictionary of 'security', each field, 'security_errors' and 'field_exceptions' to equal
+        length lists
+        :rtype: tuple
+        """
+
+        # Check for response errors
+        if msg.hasElement(RESPONSE_ERROR):
+            return None, self._response_error_factory(msg.getElement(RESPONSE_ERROR))
+
+        # Check to make sure there is security data present
+        if not msg.hasElement(SECURITY_DATA):
+            raise NotFoundException('No Security Data in message.', 666)
+
+        security_data = msg.getElement(SECURITY_DATA)
+        security_count = security_data.numValues()
+
+        # Fields are known up front, so every column can be sized before walking the securities
+        securities = [None] * security_count
+        security_errors = [None] * security_count
+        field_exceptions = [None] * security_count
+        columns = [(field, blpapi.Name(field), [None] * security_count) for field in self.fields]
+
+        for idx, item in enumerate(security_data.values()):
+
+            securities[idx] = item.getElementAsString(SECURITY)
+            field_data = item.getElement(FIELD_DATA)
+
+            # Missing fields stay None, only bulk fields need the nested walk
+            for field, field_name, column in columns:
+                if not field_data.hasElement(field_name):
+                    continue
+
+                element = field_data.getElement(field_name)
+                if element.datatype() in BBG_SEQUENCES:
+                    (column[idx],) = self._element_factory(element).values()
+                else:
+                    _, column[idx] = self._field_factory(element)
+
+            security_errors[idx] = {}
+            if item.hasElement(SECURITY_ERROR):
+                security_errors[idx] = self._security_error_factory(item.getElement(SECURITY_ERROR))
+
+            field_exceptions[idx] = self._field_exception_factory(item.getElement(FIELD_EXCEPTIONS))
+
+        results = {'security': securities}
+        for field, _, column in columns:
+            results[field] = column
+        results['security_errors'] = security_errors
+        results['field_exceptions'] = field_exceptions
+
+        return None, results
+
     def _process_historical_data_msg(self, msg):
 
             # Check for response errors
@@ -282,27 +517,32 @@ class SessionFactory(object):
 
             # Get the field data for the security
             field_data = security_data.getElement(FIELD_DATA)
+            security_data_results = {}
+            decode_row = self.row_decoder
 
-            if self._get_iterator_len(field_data) > 0:
-                security_data_results = {}
+            for item in field_data.values():
+                item_data = {}
 
-                for item in self._get_bbg_iterator(field_data):
-                    item_data = {}
-                    date = None
+                # Rows carrying fields the compiled decoder does not know about take the generic path
+                if decode_row is not None:
+                    date = decode_row(item, item_data)
+                    if len(item_data) + 1 == item.numElements():
+                        security_data_results[date] = item_data
+                        continue
+                    item_data.clear()
 
-                    for element in self._get_bbg_iterator(item):
-                        measure = str(element.name())
-                        value = element.getValue()
+                date = None
 
-                        if measure == 'date':
-                            date = value
-                            security_data_results.setdefault(date, {})
-                        else:
-                            item_data[measure] = value
+                for element in item.elements():
+                    measure = element.name()
 
-                    security_data_results[date] = item_data
-            else:
-                security_data_results = {}
+                    # Compare against the prebuilt Name rather than converting every measure to str first
+                    if measure == DATE:
+                        date = element.getValue()
+                    else:
+                        item_data[_nm(measure)] = element.getValue()
+
+                security_data_results[date] = item_data
 
             results = {'security_data': security_data_results, 'security_errors': {}, 'field_exceptions': field_exceptions}
 
@@ -311,15 +551,15 @@ class SessionFactory(object):
     def _response_error_factory(self, response_array):
         response_errors = {}
 
-        for response_error in self._get_bbg_iterator(response_array):
-            response_errors[str(response_error.name())] = response_error.getValue()
+        for response_error in response_array.elements():
+            response_errors[_nm(response_error.name())] = response_error.getValue()
 
         return response_errors
 
     def _field_exception_factory(self, field_exception_array):
         field_exceptions = {}
 
-        for field_exception in self._get_bbg_iterator(field_exception_array):
+        for field_exception in field_exception_array.values():
             error_info = field_exception.getElement(ERROR_INFO)
             field_exceptions[error_info.getElementAsString(CATEGORY)] = \
                 field_exception.getElementAsString(FIELD_ID)
@@ -329,67 +569,44 @@ class SessionFactory(object):
     def _security_error_factory(self, security_error):
         security_errors = {}
 
-        for error in self._get_bbg_iterator(security_error):
-            security_errors[str(error.name())] = error.getValue()
+        for error in security_error.elements():
+            security_errors[_nm(error.name())] = error.getValue()
 
         return security_errors
 
-    def _element_factory(self, element, duplicate_elements, results=None):
+    def _element_factory(self, element):
 
-        if not element.isValid():
-            raise blpapi.NotFoundException
+        results = {}
+        duplicate_counts = {}
+        pending = deque([(element, results)])
 
-        data_type = element.datatype()
-        element_name = str(element.name())
+        # Breadth first, so siblings are handled in the order BBG sent them
+        while pending:
+            element, parent = pending.popleft()
 
-        if data_type in BBG_SEQUENCES:
+            if not element.isValid():
+                raise blpapi.NotFoundException
 
-            if results is None:
-                results = {}
+            if element.datatype() in BBG_SEQUENCES:
+                element_name = _nm(element.name())
 
-            if element_name not in results:
-                results[element_name] = {}
-            else:
-                element_name = '{0}_{1}'.format(element_name, str(len(duplicate_elements)))
-                duplicate_elements.append(element_name)
-                results[element_name] = {}
+                # Repeated names within a parent, e.g. rows of a bulk field, get a numbered suffix
+                if element_name in parent:
+                    duplicate_count = duplicate_counts.get(id(parent), 0)
+                    duplicate_counts[id(parent)] = duplicate_count + 1
+                    element_name = '{0}_{1}'.format(element_name, duplicate_count)
 
-            for sub_element in self._get_bbg_iterator(element):
-                self._element_factory(sub_element, duplicate_elements, results[element_name])
+                child = parent[element_name] = {}
+                pending.extend((sub_element, child) for sub_element in self._get_bbg_iterator(element))
 
-        else:
-            single_value = self._field_factory(element)
-            results[single_value[0]] = single_value[1]
-            return results
+            else:
+                field_name, field_value = self._field_factory(element)
+                parent[field_name] = field_value
 
         return results
 
     def _field_factory(self, data):
-
-        dtf = DataTypeFactory()
-
-        field_data_type = data.datatype()
-
-        process_factory = {DataType.BOOL: dtf.process_bool,
-                           DataType.BYTE: dtf.process_byte,
-                           DataType.BYTEARRAY: dtf.process_byte_array,
-                           DataType.CHAR: dtf.process_char,
-                           DataType.CORRELATION_ID: dtf.process_correlation_id,
-                           DataType.DATE: dtf.process_date,
-                           DataType.DATETIME: dtf.process_date_time,
-                           DataType.DECIMAL: dtf.process_scalar,
-                           DataType.ENUMERATION: dtf.process_enumeration,
-                           DataType.FLOAT32: dtf.process_scalar,
-                           DataType.FLOAT64: dtf.process_scalar,
-                           DataType.INT32: dtf.process_scalar,
-                           DataType.INT64: dtf.process_scalar,
-                           DataType.STRING: dtf.process_string,
-                           DataType.TIME: dtf.process_time}
-        try:
-            single_val_results = process_factory.get(field_data_type)(data)
-            return [single_val_results[0], single_val_results[1]]
-        except Exception:
-            raise
+        return _decode_scalar(_nm(data.name()), data)
 
     def _get_bbg_iterator(self, obj):
         if obj.isArray():
@@ -397,68 +614,104 @@ class SessionFactory(object):
         if obj.isComplexType():
             return obj.elements()
 
-    def _get_iterator_len(self, obj):
-        if obj.isArray():
-            return obj.numValues()
-        if obj.isComplexType():
-            return obj.numElements()
-
-    def _merge_two_dicts(self, x, y):
-        # Given two dicts, merge them into a new dict as a shallow copy.
-        z = x.copy()
-        z.update(y)
-        return z
+    def _extend_columns(self, columns, more_columns):
+        for column_name, column in more_columns.items():
+            columns.setdefault(column_name, []).extend(column)
 
     def _flatten_dict(self, obj):
 
-        if not isinstance(obj, dict):
+        if not isinstance(obj, dict) or len(obj) > 1:
             return obj
-        elif len(obj) > 1:
-            return obj
-        else:
-            for k, v in obj.items():
-                if isinstance(v, dict) and len(v) == 1:
-                    return v
-                else:
-                    return self._flatten_dict(v)
+        if not obj:
+            return None
 
-class DataTypeFactory(object):
+        # Unwrap the single key; an empty dict underneath flattens to None
+        (value,) = obj.values()
+        if isinstance(value, dict) and not value:
+            return None
+        return value
 
-    def __init__(self):
-        return
 
-    def process_bool(self, data):
-        return [str(data.name()), data.getValue()]
+def _process_bool(name, data):
+    return name, data.getValue()
+
+
+def _process_byte(name, data):
+    return name, data.getValue()
+
 
-    def process_byte(self, data):
-        return [str(data.name()), data.getValue()]
+def _process_byte_array(name, data):
+    return name, data.getValue()
 
-    def process_byte_array(self, data):
-        return [str(data.name()), data.getValue()]
 
-    def process_char(self, data):
-        return [str(data.name()), data.getValue()]
+def _process_char(name, data):
+    return name, data.getValue()
 
-    def process_correlation_id(self, data):
-        return NotImplementedError
 
-    def process_date(self, data):
-        return [str(data.name()), data.getValue().strftime('%Y-%m-%d')]
+def _process_correlation_id(name, data):
+    return name, data.getValue()
 
-    def process_date_time(self, data):
-        return [str(data.name()), data.getValue().strftime('%Y-%m-%d %H:%M:%S')]
 
-    def process_enumeration(self, data):
-        return NotImplementedError
+# Dates and times are formatted from their fields directly, which is quicker than strftime for fixed numeric formats
+def _process_date(name, data):
+    value = data.getValue()
+    return name, '%04d-%02d-%02d' % (value.year, value.month, value.day)
 
-    def process_string(self, data):
-        return [str(data.name()), data.getValue()]
 
-    def process_time(self, data):
-        return [str(data.name()), data.getValue().strftime('%H:%M:%S')]
+def _process_date_time(name, data):
+    value = data.getValue()
 
-    def process_scalar(self, data):
-        return [str(data.name()), data.getValue()]
+    # blpapi hands back a plain date or time when only those parts are set
+    if not isinstance(value, datetime):
+        return name, value.strftime('%Y-%m-%d %H:%M:%S')
+    return name, '%04d-%02d-%02d %02d:%02d:%02d' % (value.year, value.month, value.day,
+                                                    value.hour, value.minute, value.second)
+
+
+def _process_enumeration(name, data):
+    return name, data.getValueAsString()
+
+
+def _process_string(name, data):
+    return name, data.getValue()
+
+
+def _process_time(name, data):
+    value = data.getValue()
+    return name, '%02d:%02d:%02d' % (value.hour, value.minute, value.second)
+
+
+def _process_scalar(name, data):
+    return name, data.getValue()
+
+
+# Scalar decoders keyed by blpapi DataType, built once at import time
+_FIELD_DISPATCH = {DataType.BOOL: _process_bool,
+                   DataType.BYTE: _process_byte,
+                   DataType.BYTEARRAY: _process_byte_array,
+                   DataType.CHAR: _process_char,
+                   DataType.CORRELATION_ID: _process_correlation_id,
+                   DataType.DATE: _process_date,
+                   DataType.DATETIME: _process_date_time,
+                   DataType.DECIMAL: _process_scalar,
+                   DataType.ENUMERATION: _process_enumeration,
+                   DataType.FLOAT32: _process_scalar,
+                   DataType.FLOAT64: _process_scalar,
+                   DataType.INT32: _process_scalar,
+                   DataType.INT64: _process_scalar,
+                   DataType.STRING: _process_string,
+                   DataType.TIME: _process_time}
+
+
+def _decode_scalar(name, data):
+    return _FIELD_DISPATCH[data.datatype()](name, data)
+
+
+# Prefer the compiled decoder when it has been built, see _bbg_fast.pyx
+try:
+    from _bbg_fast import decode_scalar as _decode_scalar
+except ImportError:
+    pass
 
 
 class IntradayBarRequest(object):
@@ -467,7 +720,8 @@ class IntradayBarRequest(object):
         return
 
     @staticmethod
-    def get(ticker, event_type, interval, start_date, end_date, max_data_points=2500):
+    def get(ticker, event_type, interval, start_date, end_date, max_data_points=2500, columnar=False, host=None,
+            port=None, options=None):
         """
         Intraday Bar Request for Bloomberg Data
         :param ticker:  Single Bloomberg Ticker e.g. IBM US Equity
@@ -482,30 +736,35 @@ class IntradayBarRequest(object):
         :type end_date: datetime
         :param max_data_points: Maximum number of points to return
         :type max_data_points: int
-        :return: Dictionary of datetimes and open, high, low, close, volume
+        :param columnar: Return one list per bar field, e.g. {'time': [...], 'open': [...]}, instead of one dict per
+        bar. The lists can be handed straight to numpy or pandas.
+        :type columnar: bool
+        :param host: Bloomberg server host, defaults to Session.DEFAULT_HOST
+        :type host: str
+        :param port: Bloomberg server port, defaults to Session.DEFAULT_PORT
+        :type port: int
+        :param options: Prepared session options to reuse, host and port are ignored when given
+        :type options: blpapi.SessionOptions
+        :return: Dictionary of datetimes to Bar records of open, high, low, close, volume
         :rtype: dict
         """
 
         try:
-            assert isinstance(ticker)
+            assert isinstance(ticker, str)
             assert isinstance(interval, int)
             assert event_type in ('TRADE', 'BID', 'ASK', 'BEST_BID', 'BEST_ASK')
             assert isinstance(start_date, datetime)
             assert isinstance(end_date, datetime)
             assert isinstance(max_data_points, int)
+            assert isinstance(columnar, bool)
         except AssertionError:
             raise
 
         try:
-            session = Session().start()
+            session = Session(host, port, options).start()
             request = Request(session, RequestType.INTRADAY_BAR_DATA).create()
-
-            request.set('security', ticker)
-            request.set('eventType', event_type)
-            request.set('interval', interval)
-            request.set('startDateTime', start_date)
-            request.set('endDateTime', end_date)
-            request.set('maxDataPoints', max_data_points)
+            IntradayBarRequest._set_request(request, ticker, event_type, interval, start_date, end_date,
+                                            max_data_points)
 
             cid = session.sendRequest(request)
 
@@ -513,12 +772,85 @@ class IntradayBarRequest(object):
             raise
 
         try:
-            return SessionFactory(session, cid, RequestType.INTRADAY_BAR_DATA).process_session()
+            return SessionFactory(session, cid, RequestType.INTRADAY_BAR_DATA, columnar).process_session()
         except:
             raise
         finally:
             session.stop()
 
+    @staticmethod
+    def get_many(tickers, event_type, interval, start_date, end_date, max_data_points=2500, columnar=False, host=None,
+                 port=None, options=None):
+        """
+        Intraday Bar Requests for several tickers, all sent over a single Bloomberg session
+        :param tickers: List of Bloomberg Ticker Strings
+        :type tickers: list
+        :param event_type: One of 'TRADE', 'BID', 'ASK', 'BEST_BID', 'BEST_ASK' or use IntradayBarRequestEventType
+        :type event_type: str
+        :param interval: Time period interval, e.g. 30
+        :type interval: int
+        :param start_date: Python Date or DateTime stamp
+        :type start_date: datetime
+        :param end_date: Python Date or DateTime stamp
+        :type end_date: datetime
+        :param max_data_points: Maximum number of points to return per ticker
+        :type max_data_points: int
+        :param columnar: Return one list per bar field for each ticker, see IntradayBarRequest.get
+        :type columnar: bool
+        :param host: Bloomberg server host, defaults to Session.DEFAULT_HOST
+        :type host: str
+        :param port: Bloomberg server port, defaults to Session.DEFAULT_PORT
+        :type port: int
+        :param options: Prepared session options to reuse, host and port are ignored when given
+        :type options: blpapi.SessionOptions
+        :return: Dictionary of Tickers & the output IntradayBarRequest.get would return for each
+        :rtype: dict
+        """
+
+        try:
+            assert isinstance(tickers, list)
+            assert isinstance(interval, int)
+            assert event_type in ('TRADE', 'BID', 'ASK', 'BEST_BID', 'BEST_ASK')
+            assert isinstance(start_date, datetime)
+            assert isinstance(end_date, datetime)
+            assert isinstance(max_data_points, int)
+            assert isinstance(columnar, bool)
+        except AssertionError:
+            raise
+
+        try:
+            session = Session(host, port, options).start()
+            service = Request(session, RequestType.INTRADAY_BAR_DATA).get_service()
+            tickers_by_cid = {}
+
+            # Send every request up front, the responses are told apart by correlation id
+            for ticker in tickers:
+                request = service.createRequest(RequestType.INTRADAY_BAR_DATA)
+                IntradayBarRequest._set_request(request, ticker, event_type, interval, start_date, end_date,
+                                                max_data_points)
+                tickers_by_cid[session.sendRequest(request)] = ticker
+
+        except:
+            raise
+
+        try:
+            outputs = SessionFactory(session, list(tickers_by_cid), RequestType.INTRADAY_BAR_DATA,
+                                     columnar).process_requests()
+            return dict((tickers_by_cid[cid], output) for cid, output in outputs.items())
+        except:
+            raise
+        finally:
+            session.stop()
+
+    @staticmethod
+    def _set_request(request, ticker, event_type, interval, start_date, end_date, max_data_points):
+        request.set('security', ticker)
+        request.set('eventType', event_type)
+        request.set('interval', interval)
+        request.set('startDateTime', start_date)
+        request.set('endDateTime', end_date)
+        request.set('maxDataPoints', max_data_points)
+
 
 class HistoricalDataRequest(object):
 
@@ -528,7 +860,7 @@ class HistoricalDataRequest(object):
     @staticmethod
     def get(tickers, fields, start_date, end_date, periodicity=Periodicity.DAILY, max_data_points=2500,
             non_trading_day_fill_option=NonTradingDayFillOption.ACTIVE_DAYS_ONLY,
-            non_trading_day_fill_method=NonTradingDayFillMethod.NIL_VALUE
+            non_trading_day_fill_method=NonTradingDayFillMethod.NIL_VALUE, host=None, port=None, options=None
 
             ):
         """
@@ -550,6 +882,12 @@ class HistoricalDataRequest(object):
         :type non_trading_day_fill_option: str
         :param non_trading_day_fill_method: Either 'PREVIOUS_VALUE' or 'NIL_VALUE'
         :type non_trading_day_fill_method: str
+        :param host: Bloomberg server host, defaults to Session.DEFAULT_HOST
+        :type host: str
+        :param port: Bloomberg server port, defaults to Session.DEFAULT_PORT
+        :type port: int
+        :param options: Prepared session options to reuse, host and port are ignored when given
+        :type options: blpapi.SessionOptions
         :return: Dictionary of Tickers, dates and fields
         :rtype: dict
         """
@@ -571,7 +909,7 @@ class HistoricalDataRequest(object):
         end_date = end_date.strftime('%Y%m%d')
 
         try:
-            session = Session().start()
+            session = Session(host, port, options).start()
             request = Request(session, RequestType.HISTORICAL_DATA).create()
 
             for ticker in tickers:
@@ -593,7 +931,7 @@ class HistoricalDataRequest(object):
             raise
 
         try:
-            return SessionFactory(session, cid, RequestType.HISTORICAL_DATA).process_session()
+            return SessionFactory(session, cid, RequestType.HISTORICAL_DATA, fields=fields).process_session()
         except:
             raise
         finally:
@@ -606,7 +944,7 @@ class ReferenceDataRequest(object):
         return
 
     @staticmethod
-    def get(tickers, fields, overrides=None):
+    def get(tickers, fields, overrides=None, columnar=False, host=None, port=None, options=None):
         """
         Reference Data Request i.e. non Market, Static Data for Bloomberg
         :param tickers: List of Bloomberg Ticker Strings
@@ -615,6 +953,15 @@ class ReferenceDataRequest(object):
         :type fields: list
         :param overrides: Dictionary of Field & Field Value overrides
         :type overrides: dict
+        :param columnar: Return one list per field, e.g. {'security': [...], 'PX_LAST': [...]}, instead of one dict per
+        ticker. The lists can be handed straight to pandas or pyarrow.
+        :type columnar: bool
+        :param host: Bloomberg server host, defaults to Session.DEFAULT_HOST
+        :type host: str
+        :param port: Bloomberg server port, defaults to Session.DEFAULT_PORT
+        :type port: int
+        :param options: Prepared session options to reuse, host and port are ignored when given
+        :type options: blpapi.SessionOptions
         :return: Dictionary of Tickers & return fields
         :rtype: dict
         """
@@ -623,11 +970,12 @@ class ReferenceDataRequest(object):
             assert isinstance(fields, list)
             if overrides:
                 assert isinstance(overrides, dict)
+            assert isinstance(columnar, bool)
         except AssertionError:
             raise
 
         try:
-            session = Session().start()
+            session = Session(host, port, options).start()
             request = Request(session, RequestType.REFERENCE_DATA).create()
 
             for ticker in tickers:
@@ -647,7 +995,7 @@ class ReferenceDataRequest(object):
             raise
 
         try:
-            return SessionFactory(session, cid, RequestType.REFERENCE_DATA).process_session()
+            return SessionFactory(session, cid, RequestType.REFERENCE_DATA, columnar, fields).process_session()
         except:
             raise
         finally: